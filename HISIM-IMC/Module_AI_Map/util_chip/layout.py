@@ -1,29 +1,99 @@
 from __future__ import annotations
 
 import math
-import json
-from dataclasses import dataclass
-from os import PathLike
-from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from os import PathLike
+
+__all__ = ["TierLayout", "ChipletLayout"]
+
+
+_ROWS_COLS = itemgetter("rows", "cols")
+_TIER_JSON = '      {"rows": %d, "cols": %d, "origin_row": %d, "origin_col": %d}'
+
+
+# Batches smaller than this stay on the NumPy path, where Numba's dispatch
+# and first-call compile cost more than they save.
+_JIT_MIN_INDICES = 1 << 14
+
+
+@lru_cache(maxsize=None)
+def _load_positions_kernel():
+    # Numba is optional and slow to import, so it is only loaded the first
+    # time a batch is large enough to use it.
+    try:
+        from Module_AI_Map.util_chip.layout_jit import positions_kernel
+    except ImportError:
+        return None
+    return positions_kernel
+
+
+@lru_cache(maxsize=None)
+def _load_json_cached(path: str, mtime: float, encoding: str) -> Mapping[str, object]:
+    # ``mtime`` is only part of the cache key so edited files are re-read.
+    import json
+
+    with open(path, "r", encoding=encoding) as fh:
+        return json.load(fh)
 
 
-@dataclass(frozen=True)
 class TierLayout:
-    """Describes the tile grid of a single tier/chiplet."""
+    """Describes the tile grid of a single tier/chiplet.
+
+    Instances are immutable; ``capacity`` is computed once at construction.
+    """
+
+    __slots__ = ("rows", "cols", "origin_row", "origin_col", "capacity")
 
     rows: int
     cols: int
-    origin_row: int = 0
-    origin_col: int = 0
-
-    def __post_init__(self) -> None:  # type: ignore[override]
-        if self.rows <= 0 or self.cols <= 0:
+    origin_row: int
+    origin_col: int
+    capacity: int
+
+    def __init__(
+        self, rows: int, cols: int, origin_row: int = 0, origin_col: int = 0
+    ) -> None:
+        if rows <= 0 or cols <= 0:
             raise ValueError("rows and cols must be positive")
+        _set = object.__setattr__
+        _set(self, "rows", rows)
+        _set(self, "cols", cols)
+        _set(self, "origin_row", origin_row)
+        _set(self, "origin_col", origin_col)
+        _set(self, "capacity", rows * cols)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"cannot assign to field {name!r} of TierLayout")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"cannot delete field {name!r} of TierLayout")
+
+    def _key(self) -> Tuple[int, int, int, int]:
+        return self.rows, self.cols, self.origin_row, self.origin_col
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (
+            f"TierLayout(rows={self.rows}, cols={self.cols}, "
+            f"origin_row={self.origin_row}, origin_col={self.origin_col})"
+        )
 
-    @property
-    def capacity(self) -> int:
-        return self.rows * self.cols
+    def __reduce__(self):
+        return self.__class__, self._key()
 
 
 class ChipletLayout:
@@ -35,14 +105,46 @@ class ChipletLayout:
         if not all(stack for stack in stacks):
             raise ValueError("Each stack must contain at least one tier")
 
-        # Normalize to lists to allow index access
-        self._stacks: List[List[TierLayout]] = [list(stack) for stack in stacks]
+        # Normalize to immutable tuples; the layout is read-only after this.
+        self._stacks: Tuple[Tuple[TierLayout, ...], ...] = tuple(
+            tuple(stack) for stack in stacks
+        )
 
         tier_count = len(self._stacks[0])
         for stack in self._stacks:
             if len(stack) != tier_count:
                 raise ValueError("All stacks must expose the same tier count")
 
+        self._flat_tiers: Tuple[TierLayout, ...] = tuple(
+            chain.from_iterable(self._stacks)
+        )
+
+        # Tiers are immutable, so the derived extents are computed once here
+        # from a temporary structure-of-arrays view of the tier geometry,
+        # indexed [stack, tier]; only the reduced results are kept.
+        geometry = np.array(
+            [(t.rows, t.cols, t.origin_row, t.origin_col) for t in self._flat_tiers],
+            dtype=np.int64,
+        ).reshape(len(self._stacks), tier_count, 4)
+        origin = geometry[..., 2:]
+        end = origin + geometry[..., :2]
+        capacity = geometry[..., 0] * geometry[..., 1]
+
+        stack_min = origin.min(axis=1)
+        stack_max = end.max(axis=1)
+        self._stack_origin: List[Tuple[int, int]] = [
+            tuple(row) for row in stack_min.tolist()
+        ]
+        self._stack_shape: List[Tuple[int, int]] = [
+            tuple(row) for row in (stack_max - stack_min).tolist()
+        ]
+        self._stack_capacity: List[int] = capacity.sum(axis=1).tolist()
+        self._max_capacity: int = int(capacity.max())
+
+        min_row, min_col = stack_min.min(axis=0).tolist()
+        max_row, max_col = stack_max.max(axis=0).tolist()
+        self._global_shape: Tuple[int, int] = (max_row - min_row, max_col - min_col)
+
     @classmethod
     def uniform(
         cls, num_stacks: int, num_tiers: int, tiles_per_tier: int
@@ -52,14 +154,14 @@ class ChipletLayout:
         if tiles_per_tier <= 0:
             raise ValueError("tiles_per_tier must be positive")
 
-        rows = int(math.ceil(math.sqrt(tiles_per_tier)))
-        cols = int(math.ceil(tiles_per_tier / rows))
+        # Integer ceil(sqrt(n)) and ceil(n / rows); avoids float rounding.
+        root = math.isqrt(tiles_per_tier)
+        rows = root if root * root == tiles_per_tier else root + 1
+        cols = (tiles_per_tier + rows - 1) // rows
 
         tier = TierLayout(rows=rows, cols=cols)
-        stacks: List[List[TierLayout]] = [
-            [tier for _ in range(num_tiers)] for _ in range(num_stacks)
-        ]
-        return cls(stacks)
+        stack: Tuple[TierLayout, ...] = (tier,) * num_tiers
+        return cls((stack,) * num_stacks)
 
     def stack_count(self) -> int:
         return len(self._stacks)
@@ -85,73 +187,60 @@ class ChipletLayout:
         return tier.origin_row, tier.origin_col
 
     def max_capacity(self) -> int:
-        return max(tier.capacity for tier in self.iter_tiers())
+        return self._max_capacity
 
     def stack_capacity(self, stack_idx: int) -> int:
-        return sum(tier.capacity for tier in self.stack(stack_idx))
+        return self._stack_capacity[stack_idx]
 
     def iter_tiers(self) -> Iterable[TierLayout]:
-        for stack in self._stacks:
-            for tier in stack:
-                yield tier
+        return iter(self._flat_tiers)
 
     def stack_origin(self, stack_idx: int) -> Tuple[int, int]:
-        stack = self.stack(stack_idx)
-        min_row = min((tier.origin_row for tier in stack), default=0)
-        min_col = min((tier.origin_col for tier in stack), default=0)
-        return min_row, min_col
+        return self._stack_origin[stack_idx]
 
     def stack_shape(self, stack_idx: int) -> Tuple[int, int]:
-        stack = self.stack(stack_idx)
-        if not stack:
-            return 0, 0
-
-        min_row, min_col = self.stack_origin(stack_idx)
-        max_row = max(tier.origin_row + tier.rows for tier in stack)
-        max_col = max(tier.origin_col + tier.cols for tier in stack)
-        return max_row - min_row, max_col - min_col
+        return self._stack_shape[stack_idx]
 
     def global_shape(self) -> Tuple[int, int]:
         """Return the bounding box (rows, cols) that encloses all tiers."""
-        if not self._stacks:
-            return 0, 0
-
-        min_row = None
-        min_col = None
-        max_row = None
-        max_col = None
-        for stack in range(self.stack_count()):
-            for tier in range(self.tier_count()):
-                layout = self.tier(stack, tier)
-                tier_min_row = layout.origin_row
-                tier_min_col = layout.origin_col
-                tier_max_row = layout.origin_row + layout.rows
-                tier_max_col = layout.origin_col + layout.cols
-                min_row = tier_min_row if min_row is None else min(min_row, tier_min_row)
-                min_col = tier_min_col if min_col is None else min(min_col, tier_min_col)
-                max_row = tier_max_row if max_row is None else max(max_row, tier_max_row)
-                max_col = tier_max_col if max_col is None else max(max_col, tier_max_col)
-
-        assert min_row is not None and min_col is not None and max_row is not None and max_col is not None
-        return max_row - min_row, max_col - min_col
+        return self._global_shape
 
     def to_dict(self) -> Dict[str, object]:
         """Export the layout as a serialisable dictionary."""
-        stacks: List[List[Mapping[str, int]]] = []
-        for stack in self._stacks:
-            stack_repr: List[Mapping[str, int]] = []
-            for tier in stack:
-                stack_repr.append(
-                    {
-                        "rows": tier.rows,
-                        "cols": tier.cols,
-                        "origin_row": tier.origin_row,
-                        "origin_col": tier.origin_col,
-                    }
-                )
-            stacks.append(stack_repr)
+        stacks: List[List[Mapping[str, int]]] = [
+            [
+                {
+                    "rows": tier.rows,
+                    "cols": tier.cols,
+                    "origin_row": tier.origin_row,
+                    "origin_col": tier.origin_col,
+                }
+                for tier in stack
+            ]
+            for stack in self._stacks
+        ]
         return {"stacks": stacks}
 
+    def to_json(
+        self, path: "PathLike[str] | str", encoding: str = "utf-8"
+    ) -> None:
+        """Write the layout to a JSON file readable by :meth:`from_json`.
+
+        The document is formatted directly from the tiers, one tier per line,
+        without building the intermediate dictionaries of :meth:`to_dict`.
+        """
+        fmt = _TIER_JSON
+        stacks = ",\n".join(
+            "    [\n"
+            + ",\n".join(
+                fmt % (t.rows, t.cols, t.origin_row, t.origin_col) for t in stack
+            )
+            + "\n    ]"
+            for stack in self._stacks
+        )
+        with open(path, "w", encoding=encoding) as fh:
+            fh.write('{\n  "stacks": [\n' + stacks + "\n  ]\n}\n")
+
     @classmethod
     def from_dict(cls, data: Mapping[str, object]) -> "ChipletLayout":
         """Create a layout from a nested mapping structure.
@@ -165,29 +254,23 @@ class ChipletLayout:
         if not isinstance(stacks_data, Sequence):
             raise ValueError("ChipletLayout dict must contain a 'stacks' sequence")
 
+        get_rc = _ROWS_COLS
         stacks: List[List[TierLayout]] = []
         for stack in stacks_data:
             if not isinstance(stack, Sequence):
                 raise ValueError("Each stack entry must be a sequence of tiers")
             parsed_stack: List[TierLayout] = []
+            append = parsed_stack.append
             for tier in stack:
-                if not isinstance(tier, Mapping):
-                    raise ValueError("Each tier entry must be a mapping")
                 try:
-                    rows = int(tier["rows"])  # type: ignore[index]
-                    cols = int(tier["cols"])  # type: ignore[index]
-                except KeyError as exc:  # pragma: no cover - defensive
+                    rows, cols = get_rc(tier)
+                    origin_row = tier.get("origin_row", 0)  # type: ignore[union-attr]
+                    origin_col = tier.get("origin_col", 0)  # type: ignore[union-attr]
+                except KeyError as exc:
                     raise ValueError("Tier description missing rows/cols") from exc
-                origin_row = int(tier.get("origin_row", 0))  # type: ignore[arg-type]
-                origin_col = int(tier.get("origin_col", 0))  # type: ignore[arg-type]
-                parsed_stack.append(
-                    TierLayout(
-                        rows=rows,
-                        cols=cols,
-                        origin_row=origin_row,
-                        origin_col=origin_col,
-                    )
-                )
+                except (TypeError, AttributeError) as exc:
+                    raise ValueError("Each tier entry must be a mapping") from exc
+                append(TierLayout(int(rows), int(cols), int(origin_row), int(origin_col)))
             stacks.append(parsed_stack)
 
         return cls(stacks)
@@ -196,9 +279,15 @@ class ChipletLayout:
     def from_json(
         cls, path: "PathLike[str] | str", encoding: str = "utf-8"
     ) -> "ChipletLayout":
-        """Load a layout description from a JSON file."""
-        with open(Path(path), "r", encoding=encoding) as fh:
-            data = json.load(fh)
+        """Load a layout description from a JSON file.
+
+        Parsed files are memoised on their path and modification time, so
+        repeated loads of an unchanged file skip the JSON parse.
+        """
+        from pathlib import Path
+
+        path = Path(path)
+        data = _load_json_cached(str(path), path.stat().st_mtime, encoding)
         return cls.from_dict(data)
 
     def position_from_index(
@@ -208,20 +297,94 @@ class ChipletLayout:
         tile_index: int,
         serpentine: bool,
         mirror: bool,
+        group_size: int = 1,
     ) -> Tuple[int, int]:
-        layout = self.tier(stack_idx, tier_idx)
+        """Map a tile index of a tier to its global ``(row, col)`` position.
+
+        Tiles are walked in horizontal bands of ``group_size`` rows, filling
+        each band column by column so that consecutive indices stay within a
+        compact group of neighbouring tiles. ``serpentine`` reverses the
+        column order of every odd band and ``mirror`` flips the whole tier.
+        The default ``group_size=1`` is the plain row-major walk.
+        """
+        layout = self._stacks[stack_idx][tier_idx]
+        rows, cols, origin_row, origin_col = (
+            layout.rows, layout.cols, layout.origin_row, layout.origin_col
+        )
         if tile_index < 0 or tile_index >= layout.capacity:
             raise IndexError("Tile index out of range for tier")
 
-        row = tile_index // layout.cols
-        col = tile_index % layout.cols
-
-        if serpentine and row % 2 == 1:
-            col = layout.cols - col - 1
+        if group_size == 1:
+            # Plain row-major walk; every band is a single row.
+            band, col = divmod(tile_index, cols)
+            row = band
+        else:
+            if group_size < 1:
+                raise ValueError("group_size must be positive")
+            band, local = divmod(tile_index, group_size * cols)
+            # The last band is shorter when rows is not a multiple of group_size.
+            height = min(group_size, rows - band * group_size)
+            col, row = divmod(local, height)
+            row += band * group_size
+
+        if serpentine and band & 1:
+            col = cols - col - 1
         if mirror:
-            row = layout.rows - row - 1
-            col = layout.cols - col - 1
+            row = rows - row - 1
+            col = cols - col - 1
 
-        origin_row, origin_col = layout.origin_row, layout.origin_col
         return origin_row + row, origin_col + col
 
+    def positions_from_indices(
+        self,
+        stack_idx: int,
+        tier_idx: int,
+        indices: "np.ndarray | Sequence[int]",
+        serpentine: bool,
+        mirror: bool,
+        group_size: int = 1,
+    ) -> np.ndarray:
+        """Vectorised :meth:`position_from_index` for a batch of tile indices.
+
+        Returns an ``(N, 2)`` int64 array of global ``(row, col)`` positions.
+        Large batches use the compiled kernel from :mod:`layout_jit` when
+        Numba is installed; everything else uses NumPy array operations.
+        """
+        if group_size < 1:
+            raise ValueError("group_size must be positive")
+        layout = self._stacks[stack_idx][tier_idx]
+        n_rows, n_cols, origin_row, origin_col = (
+            layout.rows, layout.cols, layout.origin_row, layout.origin_col
+        )
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= layout.capacity):
+            raise IndexError("Tile index out of range for tier")
+
+        kernel = _load_positions_kernel() if indices.size >= _JIT_MIN_INDICES else None
+        if kernel is not None:
+            return kernel(
+                n_rows,
+                n_cols,
+                origin_row,
+                origin_col,
+                np.ascontiguousarray(indices.ravel()),
+                bool(serpentine),
+                bool(mirror),
+                int(group_size),
+            )
+
+        if group_size == 1:
+            rows, cols = np.divmod(indices, n_cols)
+            band = rows
+        else:
+            band, local = np.divmod(indices, group_size * n_cols)
+            height = np.minimum(group_size, n_rows - band * group_size)
+            cols, rows = np.divmod(local, height)
+            rows += band * group_size
+        if serpentine:
+            cols = np.where(band & 1 == 1, n_cols - cols - 1, cols)
+        if mirror:
+            rows = n_rows - rows - 1
+            cols = n_cols - cols - 1
+
+        return np.stack((rows + origin_row, cols + origin_col), axis=1)
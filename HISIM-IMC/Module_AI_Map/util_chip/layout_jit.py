@@ -0,0 +1,44 @@
+"""Numba-compiled kernels for :mod:`Module_AI_Map.util_chip.layout`.
+
+Importing this module requires Numba; :class:`ChipletLayout` falls back to its
+NumPy implementation when the import fails.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def positions_kernel(
+    rows, cols, origin_row, origin_col, indices, serpentine, mirror, group_size
+):
+    """Map tile indices of one tier to global ``(row, col)`` positions.
+
+    Takes the tier geometry as plain integers and ``indices`` as an int64
+    array, and returns an ``(N, 2)`` int64 array. Indices are assumed to be
+    in range; callers validate them beforehand. See
+    ``ChipletLayout.position_from_index`` for the walk order.
+    """
+    n = indices.shape[0]
+    out = np.empty((n, 2), dtype=np.int64)
+    serp = 1 if serpentine else 0
+    m = 1 if mirror else 0
+    band_size = group_size * cols
+    for i in range(n):
+        if group_size == 1:
+            band = indices[i] // cols
+            col = indices[i] - band * cols
+            row = band
+        else:
+            band = indices[i] // band_size
+            local = indices[i] - band * band_size
+            height = min(group_size, rows - band * group_size)
+            col = local // height
+            row = band * group_size + local - col * height
+        s = serp & (band & 1)
+        col += s * (cols - 1 - 2 * col)
+        row += m * (rows - 1 - 2 * row)
+        col += m * (cols - 1 - 2 * col)
+        out[i, 0] = origin_row + row
+        out[i, 1] = origin_col + col
+    return out
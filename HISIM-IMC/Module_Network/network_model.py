@@ -64,20 +64,17 @@ def network_model(N_tier_real, N_stack_real, layout: Optional[ChipletLayout], co
 
         layer_end_tile=layer_start_tile+int(computing_data[layer_index][1])-1
 
-        tile_index = np.array([[0,0,0,0]])
         #import pdb;pdb.set_trace()
-        for layer_tile_number in range(layer_start_tile,layer_end_tile+1):
-            pos_row, pos_col = layout.position_from_index(
-                stack_idx,
-                tier_idx,
-                layer_tile_number,
-                serpentine=serpentine,
-                mirror=mirror,
-            )
-
-            tile_index = np.append(tile_index, [[pos_row, pos_col, tier_idx, stack_idx]],axis=0)
-        
-        tile_index=tile_index[1:]
+        positions = layout.positions_from_indices(
+            stack_idx,
+            tier_idx,
+            np.arange(layer_start_tile, layer_end_tile+1),
+            serpentine=serpentine,
+            mirror=mirror,
+        )
+        tile_index = np.column_stack(
+            (positions, np.full(len(positions), tier_idx), np.full(len(positions), stack_idx))
+        )
 
         each_tile_activation_Q=0
         if layer_index<len(computing_data)-1:
@@ -98,19 +95,18 @@ def network_model(N_tier_real, N_stack_real, layout: Optional[ChipletLayout], co
     for stack_index in range(N_stack_real):
         for tier_index in range(chiplet_num):
             capacity = tier_capacity[(stack_index, tier_index)]
-            tile_index = np.array([[0,0,0,0]])
             serpentine = True
             mirror = placement_method != 5 and tier_index % 2 == 1
-            for tile_offset in range(capacity):
-                pos_row, pos_col = layout.position_from_index(
-                    stack_index,
-                    tier_index,
-                    tile_offset,
-                    serpentine=serpentine,
-                    mirror=mirror,
-                )
-                tile_index = np.append(tile_index, [[pos_row, pos_col, tier_index, stack_index]],axis=0)
-            tile_index=tile_index[1:]
+            positions = layout.positions_from_indices(
+                stack_index,
+                tier_index,
+                np.arange(capacity),
+                serpentine=serpentine,
+                mirror=mirror,
+            )
+            tile_index = np.column_stack(
+                (positions, np.full(capacity, tier_index), np.full(capacity, stack_index))
+            )
             empty_tile_lookup[(stack_index, tier_index)] = len(empty_tile_total)
             empty_tile_total.append(tile_index)
 
@@ -135,22 +135,14 @@ class HiSimModel:
         self.ai_model = ai_model
         self.thermal = thermal
         self.filename_results = ppa_filepath
-        if isinstance(chiplet_layout, ChipletLayout) or chiplet_layout is None:
-            layout_obj = chiplet_layout
-        elif isinstance(chiplet_layout, Mapping):
-            layout_obj = ChipletLayout.from_dict(chiplet_layout)
-        elif isinstance(chiplet_layout, (str, PathLike)):
-            layout_obj = ChipletLayout.from_json(chiplet_layout)
-        else:
-            raise TypeError(
-                "chiplet_layout must be a ChipletLayout, mapping, or path to a JSON layout"
-            )
+        layout_obj = self._resolve_chiplet_layout(chiplet_layout)
 
         if layout_obj is not None:
             self.N_stack = layout_obj.stack_count()
             self.N_tier = layout_obj.tier_count()
 
         self.chiplet_layout = layout_obj
+        self._mapping_cache = None
         
         self.csv_header = [
                                 'freq_core (GHz)',
@@ -195,6 +187,10 @@ class HiSimModel:
                                 'total simulation time (s)'
                             ]
 
+        self._write_csv_headers()
+
+    def _write_csv_headers(self):
+        # Start fresh PPA files, as every newly constructed model does.
         with open(self.filename_results, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(self.csv_header)
@@ -203,6 +199,76 @@ class HiSimModel:
             writer = csv.writer(csvfile)
             writer.writerow(self.csv_header)
     
+    @staticmethod
+    def _resolve_chiplet_layout(chiplet_layout):
+        if isinstance(chiplet_layout, ChipletLayout) or chiplet_layout is None:
+            return chiplet_layout
+        elif isinstance(chiplet_layout, Mapping):
+            return ChipletLayout.from_dict(chiplet_layout)
+        elif isinstance(chiplet_layout, (str, PathLike)):
+            return ChipletLayout.from_json(chiplet_layout)
+        else:
+            raise TypeError(
+                "chiplet_layout must be a ChipletLayout, mapping, or path to a JSON layout"
+            )
+
+    # Constructor keywords whose setter is not simply ``set_<keyword>``.
+    _RECONFIGURE_SETTERS = {
+        "N_pe": "set_num_pe",
+        "chip_architect": "set_chip_architecture",
+        "placement_method": "set_placement",
+    }
+
+    def reconfigure(self, **kwargs):
+        """Update several inputs at once so one model can be reused across runs.
+
+        Accepts the same keywords as the constructor and dispatches each one to
+        its setter, then re-applies the constructor's architecture and layout
+        rules for N_tier/N_stack. Like the constructor, it starts fresh PPA
+        result files, so a reused model reports only the runs after this call.
+        """
+        for name, value in kwargs.items():
+            setter = getattr(self, self._RECONFIGURE_SETTERS.get(name, "set_" + name), None)
+            if setter is None:
+                raise TypeError(f"reconfigure() got an unexpected keyword argument {name!r}")
+            setter(value)
+
+        if self.chip_architect == "H2_5D":
+            self.N_tier = 1
+        elif self.chip_architect == "M3D":
+            self.N_stack = 1
+        elif self.chip_architect == "M2D":
+            self.N_stack = 1
+            self.N_tier = 1
+
+        if self.chiplet_layout is not None:
+            self.N_stack = self.chiplet_layout.stack_count()
+            self.N_tier = self.chiplet_layout.tier_count()
+
+        self._write_csv_headers()
+
+    def _mapping_key(self):
+        return (
+            self.ai_model,
+            self.placement_method,
+            self.quant_act,
+            self.xbar_size,
+            self.N_crossbar,
+            self.N_pe,
+            self.quant_weight,
+            self.N_tile,
+            self.N_tier,
+            self.N_stack,
+            self.chiplet_layout,
+        )
+
+    def invalidate_cache(self):
+        """Drop the cached mapping so the next run_model() redoes it.
+
+        Only needed when model internals are mutated without a setter.
+        """
+        self._mapping_cache = None
+
     ################################
     ############ Inputs ############
     ################################
@@ -239,9 +305,11 @@ class HiSimModel:
 
     def set_N_tier(self, N_tier):
         self.N_tier = N_tier
+        self.invalidate_cache()
 
     def set_N_stack(self, N_stack):
         self.N_stack = N_stack
+        self.invalidate_cache()
 
     def set_volt(self, volt):
         self.volt = volt
@@ -252,11 +320,18 @@ class HiSimModel:
     def set_router(self, route_method): 
         self.route_method = route_method
 
+    def set_routing_method(self, routing_method):
+        self.routing_method = routing_method
+
     def set_percent_router(self, percent_router):
         self.percent_router = percent_router
 
     def set_W2d(self, W2d):
         self.W2d = W2d
+
+    def set_chiplet_layout(self, chiplet_layout):
+        self.chiplet_layout = self._resolve_chiplet_layout(chiplet_layout)
+        self.invalidate_cache()
     
     
     ################################
@@ -313,7 +388,6 @@ class HiSimModel:
         #     Mapping: from AI model -> hardware mapping                      #
         #                                                                     #
         #---------------------------------------------------------------------#
-        network_params = load_ai_network(self.ai_model)                 #Load AI network parameters from the network csv file
         sim_name="Densenet_placement_1"
         filename_results = "./Results/PPA.csv"                          #Location to store PPA results
 
@@ -326,25 +400,46 @@ class HiSimModel:
         #                                                                     #
         #---------------------------------------------------------------------#
         filename = "./Debug/to_interconnect_analy/layer_inform.csv"
-        active_layout = self.chiplet_layout or ChipletLayout.uniform(
-            num_stacks=self.N_stack,
-            num_tiers=self.N_tier,
-            tiles_per_tier=self.N_tile,
-        )
+        # Sweeps over e.g. tsv_pitch or W2d leave the mapping untouched, so the
+        # previous mapping is reused while its inputs and layer_inform.csv
+        # (which compute_IMC_model reads back) are unchanged.
+        mapping_key = self._mapping_key()
+        cache = self._mapping_cache
+        if (
+            cache is not None
+            and cache[0] == mapping_key
+            and os.path.exists(filename)
+            and os.stat(filename).st_mtime_ns == cache[1]
+        ):
+            network_params, active_layout, mapping_results = cache[2:]
+        else:
+            network_params = load_ai_network(self.ai_model)                 #Load AI network parameters from the network csv file
+            active_layout = self.chiplet_layout or ChipletLayout.uniform(
+                num_stacks=self.N_stack,
+                num_tiers=self.N_tier,
+                tiles_per_tier=self.N_tile,
+            )
 
-        mapping_results= model_mapping(
-            filename,
-            self.placement_method,
-            network_params,
-            self.quant_act,
-            self.xbar_size,
-            self.N_crossbar,
-            self.N_pe,
-            self.quant_weight,
-            self.N_tile,
-            self.N_tier,
-            self.N_stack,
-            layout=active_layout)
+            mapping_results= model_mapping(
+                filename,
+                self.placement_method,
+                network_params,
+                self.quant_act,
+                self.xbar_size,
+                self.N_crossbar,
+                self.N_pe,
+                self.quant_weight,
+                self.N_tile,
+                self.N_tier,
+                self.N_stack,
+                layout=active_layout)
+            self._mapping_cache = (
+                mapping_key,
+                os.stat(filename).st_mtime_ns,
+                network_params,
+                active_layout,
+                mapping_results,
+            )
 
 
         #print("total_tiles_real: ", mapping_results[0])
@@ -40,13 +40,22 @@
 #   Jingbo Sun      Email: jsun127@asu.edu
 #   Jennifer Zhou   Email:
 # *******************************************************************************/
+import argparse
+import multiprocessing
+import os
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from Module_AI_Map.util_chip.layout import ChipletLayout
 from hisim_model import HiSimModel
 
 
+DONE_MESSAGE = (
+    "Test case {} done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
+)
+
+
 def load_layout(path: Path, label: str) -> Optional[ChipletLayout]:
     """Load a layout JSON file if it exists."""
     try:
@@ -62,30 +71,25 @@ def load_layout(path: Path, label: str) -> Optional[ChipletLayout]:
         return layout
 
 
-def wait_for_next_case() -> None:
+def wait_for_next_case(interactive: bool) -> None:
+    if not interactive:
+        return
     print("")
     input("Press Enter to execute next test case")
     print("")
 
 
-if __name__ == "__main__":
-    base_dir = Path(__file__).resolve().parent
-    layout_3d_path = base_dir / "Demos" / "heterogeneous_3d_layout.json"
-    layout_2p5d_path = base_dir / "Demos" / "heterogeneous_2p5d_layout.json"
-
-    hetero_layout_3d = load_layout(layout_3d_path, "3D/3.5D")
-    hetero_layout_2p5d = load_layout(layout_2p5d_path, "2.5D")
+def build_cases(
+    hetero_layout_3d: Optional[ChipletLayout],
+    hetero_layout_2p5d: Optional[ChipletLayout],
+) -> List[Dict[str, object]]:
+    """Describe every test case as a banner, HiSimModel kwargs and an optional sweep.
 
-    # Test Case 1
-    print("Test Case 1: Running HISIM to obtain PPA")
-    print("AI Network: ViT")
-    print("HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-9-100-2-2-3.5D")
-    case1_kwargs = dict(
-        chip_architect="M3_5D",
+    ``sweep`` is ``(setter name, message format, values)``; the model is
+    re-run once per value after calling the setter.
+    """
+    common = dict(
         xbar_size=1024,
-        N_tile=100,
-        N_pe=9,
-        N_tier=2,
         freq_computing=1,
         fclk_noc=1,
         placement_method=5,
@@ -93,235 +97,278 @@ if __name__ == "__main__":
         percent_router=1,
         tsv_pitch=5,
         W2d=32,
+        chiplet_layout=None,
+    )
+    cases: List[Dict[str, object]] = []
+
+    # Test Case 1
+    case1_kwargs = dict(
+        common,
+        chip_architect="M3_5D",
+        N_tile=100,
+        N_pe=9,
+        N_tier=2,
         ai_model="vit",
         thermal=False,
         N_stack=2,
+        chiplet_layout=hetero_layout_3d,
     )
-    if hetero_layout_3d is not None:
-        case1_kwargs["chiplet_layout"] = hetero_layout_3d
-    hisim = HiSimModel(**case1_kwargs)
-    hisim.run_model()
-    print(
-        "Test case 1 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
-    )
-    print("")
-    wait_for_next_case()
+    cases.append(dict(
+        banner=[
+            "Test Case 1: Running HISIM to obtain PPA",
+            "AI Network: ViT",
+            "HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-9-100-2-2-3.5D",
+        ],
+        kwargs=case1_kwargs,
+        sweep=None,
+    ))
 
     # Test Case 2
-    print("Test Case 2: Running HISIM to obtain PPA")
-    print("AI Network: densenet121")
-    print("HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-64-2-2")
     case2_kwargs = dict(
+        common,
         chip_architect="M3_5D",
-        xbar_size=1024,
         N_tile=64,
         N_pe=36,
         N_tier=2,
-        freq_computing=1,
-        fclk_noc=1,
-        placement_method=5,
-        router_times_scale=1,
-        percent_router=1,
-        tsv_pitch=5,
-        W2d=32,
         ai_model="densenet121",
         thermal=False,
         N_stack=2,
+        chiplet_layout=hetero_layout_3d,
     )
-    if hetero_layout_3d is not None:
-        case2_kwargs["chiplet_layout"] = hetero_layout_3d
-    hisim = HiSimModel(**case2_kwargs)
-    hisim.run_model()
-    print(
-        "Test case 2 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
-    )
-    print("")
-    wait_for_next_case()
+    cases.append(dict(
+        banner=[
+            "Test Case 2: Running HISIM to obtain PPA",
+            "AI Network: densenet121",
+            "HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-64-2-2",
+        ],
+        kwargs=case2_kwargs,
+        sweep=None,
+    ))
 
     # Test Case 3
-    print("Test Case 3: Running HISIM to obtain PPA for different TSV pitches")
-    print("AI Network: densenet121")
-    print("HW configuration ( Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-2-1-3D")
-    case3_kwargs = dict(
-        chip_architect="M3D",
-        xbar_size=1024,
-        N_tile=81,
-        N_pe=36,
-        N_tier=2,
-        freq_computing=1,
-        fclk_noc=1,
-        placement_method=5,
-        router_times_scale=1,
-        percent_router=1,
-        tsv_pitch=5,
-        W2d=32,
-        ai_model="densenet121",
-        thermal=False,
-        N_stack=1,
-    )
-    hisim = HiSimModel(**case3_kwargs)
-    tsv_pitch = [2, 3, 4, 5, 10, 20]  # um
-    for pitch in tsv_pitch:
-        print("TSV_pitch:", pitch, "um")
-        hisim.set_tsv_pitch(pitch)
-        hisim.run_model()
-    hisim.set_tsv_pitch(case3_kwargs["tsv_pitch"])
-    print(
-        "Test case 3 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
-    )
-    print("")
-    wait_for_next_case()
+    cases.append(dict(
+        banner=[
+            "Test Case 3: Running HISIM to obtain PPA for different TSV pitches",
+            "AI Network: densenet121",
+            "HW configuration ( Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-2-1-3D",
+        ],
+        kwargs=dict(
+            common,
+            chip_architect="M3D",
+            N_tile=81,
+            N_pe=36,
+            N_tier=2,
+            ai_model="densenet121",
+            thermal=False,
+            N_stack=1,
+        ),
+        sweep=("set_tsv_pitch", "TSV_pitch: {} um", [2, 3, 4, 5, 10, 20]),
+    ))
 
     # Test Case 4
-    print("Test Case 4: Running HISIM to obtain PPA for different NoC bandwidths")
-    print("AI Network: densenet121")
-    print("HW configuration ( Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-2-1-3D")
-    case4_kwargs = dict(
-        chip_architect="M3D",
-        xbar_size=1024,
-        N_tile=81,
-        N_pe=36,
-        N_tier=2,
-        freq_computing=1,
-        fclk_noc=1,
-        placement_method=5,
-        router_times_scale=1,
-        percent_router=1,
-        tsv_pitch=5,
-        W2d=32,
-        ai_model="densenet121",
-        thermal=False,
-        N_stack=1,
-    )
-    hisim = HiSimModel(**case4_kwargs)
-    noc_width = [i for i in range(1, 32, 5)]  # um
-    for width in noc_width[1:]:
-        print("number of links of 2D NoC:", width)
-        hisim.set_W2d(width)
-        hisim.run_model()
-    hisim.set_W2d(case4_kwargs["W2d"])
-    print(
-        "Test case 4 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
-    )
-    print("")
-    wait_for_next_case()
+    noc_width = [i for i in range(1, 32, 5)]
+    cases.append(dict(
+        banner=[
+            "Test Case 4: Running HISIM to obtain PPA for different NoC bandwidths",
+            "AI Network: densenet121",
+            "HW configuration ( Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-2-1-3D",
+        ],
+        kwargs=dict(
+            common,
+            chip_architect="M3D",
+            N_tile=81,
+            N_pe=36,
+            N_tier=2,
+            ai_model="densenet121",
+            thermal=False,
+            N_stack=1,
+        ),
+        sweep=("set_W2d", "number of links of 2D NoC: {}", noc_width[1:]),
+    ))
 
     # Test Case 5
-    print("Test Case 5: Running HISIM to obtain PPA and thermal for different Ntier")
-    print("AI Network: densenet121")
-    print("HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-169-Depends on input config-1")
-    case5_kwargs = dict(
-        chip_architect="M3D",
-        xbar_size=1024,
-        N_tile=169,
-        N_pe=36,
-        N_tier=2,
-        freq_computing=1,
-        fclk_noc=1,
-        placement_method=5,
-        router_times_scale=1,
-        percent_router=1,
-        tsv_pitch=5,
-        W2d=32,
-        ai_model="densenet121",
-        thermal=True,
-        N_stack=1,
-    )
-    hisim = HiSimModel(**case5_kwargs)
-    for tier in range(1, 4):
-        print("number of tiers:", tier)
-        hisim.set_N_tier(tier)
-        hisim.run_model()
-    print(
-        "Test case 5 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
-    )
-    print("")
-    wait_for_next_case()
+    cases.append(dict(
+        banner=[
+            "Test Case 5: Running HISIM to obtain PPA and thermal for different Ntier",
+            "AI Network: densenet121",
+            "HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-169-Depends on input config-1",
+        ],
+        kwargs=dict(
+            common,
+            chip_architect="M3D",
+            N_tile=169,
+            N_pe=36,
+            N_tier=2,
+            ai_model="densenet121",
+            thermal=True,
+            N_stack=1,
+        ),
+        sweep=("set_N_tier", "number of tiers: {}", list(range(1, 4))),
+    ))
 
     # Test Case 6
-    print("Test Case 6: Running HISIM to obtain PPA and thermal")
-    print("AI Network: densenet121")
-    print("HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-2-1-3D")
-    case6_kwargs = dict(
-        chip_architect="M3D",
-        xbar_size=1024,
-        N_tile=81,
-        N_pe=36,
-        N_tier=2,
-        freq_computing=1,
-        fclk_noc=1,
-        placement_method=5,
-        router_times_scale=1,
-        percent_router=1,
-        tsv_pitch=5,
-        W2d=32,
-        ai_model="densenet121",
-        thermal=True,
-        N_stack=1,
-    )
-    hisim = HiSimModel(**case6_kwargs)
-    hisim.run_model()
-    print(
-        "Test case 6 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
-    )
-    print("")
-    wait_for_next_case()
+    cases.append(dict(
+        banner=[
+            "Test Case 6: Running HISIM to obtain PPA and thermal",
+            "AI Network: densenet121",
+            "HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-2-1-3D",
+        ],
+        kwargs=dict(
+            common,
+            chip_architect="M3D",
+            N_tile=81,
+            N_pe=36,
+            N_tier=2,
+            ai_model="densenet121",
+            thermal=True,
+            N_stack=1,
+        ),
+        sweep=None,
+    ))
 
     # Test Case 7
-    print("Test Case 7: Running HISIM to obtain PPA and thermal")
-    print("AI Network: ViT")
-    print("HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-9-169-2-1-3D")
-    case7_kwargs = dict(
-        chip_architect="M3D",
-        xbar_size=1024,
-        N_tile=169,
-        N_pe=9,
-        N_tier=2,
-        freq_computing=1,
-        fclk_noc=1,
-        placement_method=5,
-        router_times_scale=1,
-        percent_router=1,
-        tsv_pitch=5,
-        W2d=32,
-        ai_model="vit",
-        thermal=True,
-        N_stack=1,
-    )
-    hisim = HiSimModel(**case7_kwargs)
-    hisim.run_model()
-    print(
-        "Test case 7 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
-    )
-    print("")
-    wait_for_next_case()
+    cases.append(dict(
+        banner=[
+            "Test Case 7: Running HISIM to obtain PPA and thermal",
+            "AI Network: ViT",
+            "HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-9-169-2-1-3D",
+        ],
+        kwargs=dict(
+            common,
+            chip_architect="M3D",
+            N_tile=169,
+            N_pe=9,
+            N_tier=2,
+            ai_model="vit",
+            thermal=True,
+            N_stack=1,
+        ),
+        sweep=None,
+    ))
 
     # Test Case 8
-    print("Test Case 8: Running HISIM to obtain PPA and thermal")
-    print("AI Network: vit")
-    print("HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-1-2-2.5D")
     case8_kwargs = dict(
+        common,
         chip_architect="H2_5D",
-        xbar_size=1024,
         N_tile=81,
         N_pe=36,
         N_tier=1,
-        freq_computing=1,
-        fclk_noc=1,
         placement_method=1,
-        router_times_scale=1,
-        percent_router=1,
-        tsv_pitch=5,
-        W2d=32,
         ai_model="vit",
         thermal=False,
         N_stack=2,
+        chiplet_layout=hetero_layout_2p5d,
+    )
+    cases.append(dict(
+        banner=[
+            "Test Case 8: Running HISIM to obtain PPA and thermal",
+            "AI Network: vit",
+            "HW configuration (Xbar-Npe-Ntile-Ntier-Nstack-chip_arch):1024-36-81-1-2-2.5D",
+        ],
+        kwargs=case8_kwargs,
+        sweep=None,
+    ))
+
+    return cases
+
+
+def run_case(case: Dict[str, object], hisim: Optional[HiSimModel] = None) -> HiSimModel:
+    """Run a single test case, including its parameter sweep if it has one.
+
+    An existing ``hisim`` is reconfigured with the case's kwargs instead of
+    constructing a new model; the model used is returned for further reuse.
+    """
+    for line in case["banner"]:
+        print(line)
+    kwargs = case["kwargs"]
+    if hisim is None:
+        hisim = HiSimModel(**kwargs)
+    else:
+        hisim.reconfigure(**kwargs)
+    sweep = case["sweep"]
+    if sweep is None:
+        hisim.run_model()
+    else:
+        setter_name, message, values = sweep
+        setter = getattr(hisim, setter_name)
+        for value in values:
+            print(message.format(value))
+            setter(value)
+            hisim.run_model()
+    return hisim
+
+
+def _run_one(task) -> int:
+    """Pool worker: run one case inside its own results directory.
+
+    HiSimModel and its submodules write to ``./Results`` and ``./Debug``
+    relative to the working directory, so each worker changes into a
+    private directory first to keep concurrent cases from clobbering each
+    other's outputs.
+    """
+    label, case, results_subdir = task
+    os.makedirs(results_subdir, exist_ok=True)
+    os.chdir(results_subdir)
+    os.makedirs("./Debug/to_interconnect_analy", exist_ok=True)
+    os.makedirs("./Results/result_thermal/1stacks", exist_ok=True)
+    run_case(case)
+    print(f"Test case {label} done. Results written to {results_subdir}")
+    return label
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HISIM test bench")
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="run all test cases concurrently, each writing to Results/run_tb/case<N>/",
     )
-    if hetero_layout_2p5d is not None:
-        case8_kwargs["chiplet_layout"] = hetero_layout_2p5d
-    hisim = HiSimModel(**case8_kwargs)
-    hisim.run_model()
-    print(
-        "Test case 8 done. Please check Results/PPA.csv for PPA information and Results/tile_map.png for tile mapping information"
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--interactive",
+        dest="interactive",
+        action="store_true",
+        default=None,
+        help="pause for Enter between test cases (default when stdin is a terminal)",
     )
-    print("")
+    mode.add_argument(
+        "--batch",
+        dest="interactive",
+        action="store_false",
+        help="run all test cases without pausing",
+    )
+    args = parser.parse_args()
+    if args.interactive is None:
+        args.interactive = sys.stdin.isatty()
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    base_dir = Path(__file__).resolve().parent
+    layout_3d_path = base_dir / "Demos" / "heterogeneous_3d_layout.json"
+    layout_2p5d_path = base_dir / "Demos" / "heterogeneous_2p5d_layout.json"
+
+    hetero_layout_3d = load_layout(layout_3d_path, "3D/3.5D")
+    hetero_layout_2p5d = load_layout(layout_2p5d_path, "2.5D")
+
+    cases = build_cases(hetero_layout_3d, hetero_layout_2p5d)
+
+    if args.parallel:
+        tasks = [
+            (label, case, str(base_dir / "Results" / "run_tb" / f"case{label}"))
+            for label, case in enumerate(cases, start=1)
+        ]
+        processes = min(len(tasks), multiprocessing.cpu_count())
+        with multiprocessing.Pool(processes) as pool:
+            pool.map(_run_one, tasks)
+    else:
+        # Cases sharing a chip architecture reuse one model via reconfigure().
+        models: Dict[str, HiSimModel] = {}
+        for label, case in enumerate(cases, start=1):
+            architect = case["kwargs"]["chip_architect"]
+            models[architect] = run_case(case, models.get(architect))
+            print(DONE_MESSAGE.format(label))
+            print("")
+            if label < len(cases):
+                wait_for_next_case(args.interactive)